@@ -1,6 +1,9 @@
 from flask import Flask, render_template, request, jsonify
 from utils.tfidf_analyzer import TFIDFAnalyzer
 from utils.web_scraper import WebScraper
+from utils.deduplicator import DocumentDeduplicator
+from utils.traffic_log import TrafficRecorder
+import os
 import time
 import traceback
 
@@ -9,6 +12,10 @@ app = Flask(__name__)
 # Initialize components
 tfidf_analyzer = TFIDFAnalyzer()
 web_scraper = WebScraper()
+deduplicator = DocumentDeduplicator()
+
+# Set CLARIFO_CAPTURE_LOG to a JSONL path to record anonymized /check_fact traffic
+traffic_recorder = TrafficRecorder(os.environ.get('CLARIFO_CAPTURE_LOG'))
 
 
 @app.route('/')
@@ -18,11 +25,15 @@ def index():
 
 @app.route('/check_fact', methods=['POST'])
 def check_fact():
+    statement = ''
+    stage_timings = {}
+
     try:
         data = request.get_json()
         statement = data.get('statement', '').strip()
 
         if not statement:
+            traffic_recorder.record(statement, 400, stage_timings)
             return jsonify({'error': 'Please enter a statement to check'}), 400
 
         print(f"Checking statement: {statement}")
@@ -33,31 +44,45 @@ def check_fact():
         # Step 1: Search for relevant sources
         print("Searching for relevant sources...")
         sources = web_scraper.search_sources(statement)
+        stage_timings['search'] = time.time() - start_time
 
-        # Step 2: Scrape content from sources
+        # Step 2: Scrape content from sources, dropping near-duplicates as they
+        # arrive so a duplicate does not use up one of the scrape slots
         print("Scraping content from sources...")
+        stage_start = time.time()
         documents = []
-        successful_scrapes = 0
+        merged_documents = []
+        collected = 0
+        dedupe_time = 0
 
         for source in sources:
-            if successful_scrapes >= 3:  # Limit to 3 successful scrapes for speed
+            if len(documents) >= 3:  # Limit to 3 distinct documents for speed
                 break
 
             content = web_scraper.scrape_content(source['url'])
             if content and len(content) > 100:
-                documents.append({
+                collected += 1
+                print(f"Successfully scraped content from {source['name']}")
+
+                dedupe_start = time.time()
+                merge = deduplicator.merge_document(documents, {
                     'source': source['name'],
                     'url': source['url'],
                     'content': content,
                     'relevance': source.get('relevance', 0.5)
                 })
-                successful_scrapes += 1
-                print(f"Successfully scraped content from {source['name']}")
+                if merge:
+                    merged_documents.append(merge)
+                dedupe_time += time.time() - dedupe_start
 
-        print(f"Successfully collected {len(documents)} documents for analysis")
+        dedupe_report = deduplicator.build_report(collected, documents, merged_documents)
+        print(f"Collected {len(documents)} distinct documents for analysis ({len(merged_documents)} merged)")
+        stage_timings['scrape'] = time.time() - stage_start - dedupe_time
+        stage_timings['dedupe'] = dedupe_time
 
         # Step 3: Analyze with TF-IDF
         print("Analyzing with TF-IDF...")
+        stage_start = time.time()
         if documents:
             accuracy, analysis_details = tfidf_analyzer.analyze_statement(statement, documents)
             print(f"TF-IDF analysis completed with accuracy: {accuracy}")
@@ -71,6 +96,9 @@ def check_fact():
             }
             print("Using fallback analysis due to scraping issues")
 
+        analysis_details['deduplication'] = dedupe_report
+        stage_timings['analysis'] = time.time() - stage_start
+
         # Calculate processing time
         processing_time = round(time.time() - start_time, 2)
 
@@ -89,11 +117,14 @@ def check_fact():
         }
 
         print(f"Analysis complete. Final accuracy: {accuracy}")
+        stage_timings['total'] = time.time() - start_time
+        traffic_recorder.record(statement, 200, stage_timings, len(documents))
         return jsonify(response)
 
     except Exception as e:
         print(f"Error in fact checking: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
+        traffic_recorder.record(statement, 500, stage_timings)
         return jsonify(
             {'error': 'An error occurred during analysis. Please try a different statement or try again later.'}), 500
 
@@ -0,0 +1,273 @@
+"""Replay captured /check_fact traffic against the app with stand-in upstreams.
+
+Capture traffic by running the app with CLARIFO_CAPTURE_LOG=traffic.jsonl, then:
+
+    python replay_traffic.py traffic.jsonl --concurrency 8 --rate 5 --requests 200
+
+Requests are sent in-process through Flask's test client. Wikipedia and the
+scraped sites are replaced by local stand-ins with a configurable latency, so
+results reflect the app itself rather than the network.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import app as clarifo_app
+
+
+SAMPLE_STATEMENTS = [
+    "Python is a programming language.",
+    "A bear is a mammal.",
+    "The Earth revolves around the Sun.",
+    "Water boils at 100 degrees Celsius at sea level.",
+    "The Moon is made of cheese."
+]
+
+
+class StubResponse:
+    def __init__(self, status_code=200, content=b'', payload=None):
+        self.status_code = status_code
+        self.content = content
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"Stand-in upstream returned {self.status_code}")
+
+
+class StubUpstreamSession:
+    """Stands in for requests.Session, answering Wikipedia and page requests locally"""
+
+    def __init__(self, latency=0.05, error_rate=0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.headers = {}
+
+        # Calls and injected failures per upstream, for the report
+        self.stats = {'wikipedia': {'calls': 0, 'failures': 0}, 'pages': {'calls': 0, 'failures': 0}}
+        self.stats_lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        # Jitter the latency so concurrent requests do not move in lockstep
+        time.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        upstream = 'wikipedia' if params and params.get('action') == 'query' else 'pages'
+        failed = random.random() < self.error_rate
+        with self.stats_lock:
+            self.stats[upstream]['calls'] += 1
+            if failed:
+                self.stats[upstream]['failures'] += 1
+
+        if failed:
+            return StubResponse(status_code=503)
+
+        if upstream == 'wikipedia':
+            return StubResponse(payload=self.wikipedia_query(params['titles'].split('|')))
+
+        return StubResponse(content=self.page_html(url).encode('utf-8'))
+
+    def wikipedia_query(self, titles):
+        """Pretend single-word and two-word titles exist and longer ones do not"""
+        pages = {}
+        for i, title in enumerate(titles):
+            if len(title.split()) <= 2:
+                pages[str(i + 1)] = {
+                    'title': title,
+                    'fullurl': 'https://en.wikipedia.org/wiki/' + title.replace(' ', '_'),
+                    'extract': f"{title} is a subject with a long history of study. " * 4
+                }
+            else:
+                pages[str(-(i + 1))] = {'title': title, 'missing': ''}
+
+        return {'query': {'pages': pages}}
+
+    def page_html(self, url):
+        topic = urlparse(url).netloc or 'source'
+        paragraph = (f"This page from {topic} covers {url} in detail, including its background, "
+                     f"key facts, related subjects and references to further reading.")
+        return f"<html><body><article><p>{paragraph}</p><p>{paragraph}</p></article></body></html>"
+
+
+def load_statements(log_path):
+    """Read statements from a capture log, skipping requests that were rejected"""
+    if not log_path:
+        return list(SAMPLE_STATEMENTS)
+
+    statements = []
+    with open(log_path, encoding='utf-8') as log_file:
+        for line in log_file:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            statement = entry.get('payload', entry).get('statement', '')
+            if statement and entry.get('status', 200) != 400:
+                statements.append(statement)
+
+    return statements
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def hit_rate(before, after):
+    hits = after['hits'] - before['hits']
+    total = hits + after['misses'] - before['misses']
+    return round(hits / total, 3) if total else None
+
+
+def is_degraded(body):
+    """Whether a 200 response came from a fallback path rather than a full analysis"""
+    if not body:
+        return True
+    term_analysis = body.get('analysis_details', {}).get('term_analysis', {})
+    # No sources means the scraping fallback; no terms means TF-IDF fitting failed
+    return body.get('sources_analyzed', 0) == 0 or term_analysis.get('total_terms', 0) == 0
+
+
+def replay(statements, total_requests, concurrency, rate):
+    """Send requests and return per-request (latency, status, degraded) results
+
+    With rate > 0 requests arrive on a Poisson schedule and latency is measured
+    from the scheduled arrival, so time spent queued counts. With rate 0 the
+    replay is a closed loop: each worker sends its next request only once the
+    previous one has finished, and latency is measured from the actual send.
+    """
+    results = []
+    results_lock = threading.Lock()
+    client_local = threading.local()
+
+    def send(statement, scheduled_at=None):
+        if not hasattr(client_local, 'client'):
+            client_local.client = clarifo_app.app.test_client()
+
+        sent_at = time.time()
+        try:
+            response = client_local.client.post('/check_fact', json={'statement': statement})
+            status = response.status_code
+            degraded = status == 200 and is_degraded(response.get_json(silent=True))
+        except Exception as e:
+            print(f"Replay request error: {e}")
+            status = 0
+            degraded = False
+
+        with results_lock:
+            results.append((time.time() - (sent_at if scheduled_at is None else scheduled_at), status, degraded))
+
+    start_time = time.time()
+
+    if rate > 0:
+        next_arrival = start_time
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for i in range(total_requests):
+                next_arrival += random.expovariate(rate)
+                time.sleep(max(0, next_arrival - time.time()))
+                executor.submit(send, statements[i % len(statements)], next_arrival)
+    else:
+        next_index = iter(range(total_requests))
+        index_lock = threading.Lock()
+
+        def worker():
+            while True:
+                with index_lock:
+                    i = next(next_index, None)
+                if i is None:
+                    return
+                send(statements[i % len(statements)])
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(concurrency):
+                executor.submit(worker)
+
+    return results, time.time() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay /check_fact traffic and report load-test results")
+    parser.add_argument('log', nargs='?', help="capture log written via CLARIFO_CAPTURE_LOG (default: sample statements)")
+    parser.add_argument('--requests', type=int, default=0, help="number of requests to send (default: one per logged statement)")
+    parser.add_argument('--concurrency', type=int, default=4, help="maximum requests in flight")
+    parser.add_argument('--rate', type=float, default=0, help="mean arrival rate in requests/second, 0 for closed loop")
+    parser.add_argument('--upstream-latency', type=float, default=0.05, help="mean stand-in upstream latency in seconds")
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for arrivals and upstream behaviour")
+    args = parser.parse_args()
+
+    if args.requests < 0:
+        parser.error("--requests must be 0 or more")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.rate < 0:
+        parser.error("--rate must be 0 or more")
+    if args.upstream_latency < 0:
+        parser.error("--upstream-latency must be 0 or more")
+    if not 0 <= args.upstream_error_rate <= 1:
+        parser.error("--upstream-error-rate must be between 0 and 1")
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    statements = load_statements(args.log)
+    if not statements:
+        print("No statements to replay.")
+        return
+
+    total_requests = args.requests or len(statements)
+
+    # Route every upstream call to the local stand-ins; the politeness delay does not apply to them
+    upstream = StubUpstreamSession(args.upstream_latency, args.upstream_error_rate)
+    clarifo_app.web_scraper.session = upstream
+    clarifo_app.web_scraper.request_delay = 0
+
+    wikipedia_before = dict(clarifo_app.web_scraper.cache_stats)
+    signature_before = dict(clarifo_app.deduplicator.cache_stats)
+    scrapes_before = dict(clarifo_app.web_scraper.scrape_stats)
+
+    print(f"Replaying {total_requests} requests (concurrency={args.concurrency}, rate={args.rate or 'closed loop'})...")
+    results, duration = replay(statements, total_requests, args.concurrency, args.rate)
+
+    latencies = [latency for latency, _, _ in results]
+    http_errors = len([status for _, status, _ in results if status != 200])
+    degraded = len([flag for _, _, flag in results if flag])
+
+    scrapes = {outcome: count - scrapes_before[outcome]
+               for outcome, count in clarifo_app.web_scraper.scrape_stats.items()}
+    scrape_total = scrapes['scraped'] + scrapes['simulated']
+
+    report = {
+        'requests': len(results),
+        'duration_seconds': round(duration, 2),
+        'throughput_rps': round(len(results) / duration, 2) if duration else 0,
+        'latency_seconds': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p90': round(percentile(latencies, 0.90), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(max(latencies), 3) if latencies else 0
+        },
+        'http_error_rate': round(http_errors / len(results), 3) if results else 0,
+        'degraded_rate': round(degraded / len(results), 3) if results else 0,
+        'simulated_scrape_rate': round(scrapes['simulated'] / scrape_total, 3) if scrape_total else 0,
+        'upstream_errors': upstream.stats,
+        'cache_hit_rates': {
+            'wikipedia_titles': hit_rate(wikipedia_before, clarifo_app.web_scraper.cache_stats),
+            'document_signatures': hit_rate(signature_before, clarifo_app.deduplicator.cache_stats)
+        }
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
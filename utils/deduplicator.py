@@ -0,0 +1,123 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+
+class DocumentDeduplicator:
+    def __init__(self, max_distance=8, shingle_size=1):
+        # Two documents are near-duplicates when their 64-bit SimHash
+        # signatures differ in at most max_distance bits. Single-word shingles
+        # keep signatures stable for the short extracts we usually get back
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+
+        # URL -> (content digest, signature), evicting the least recently used
+        # entries past the size limit so a long-running server stays bounded
+        self.signature_cache = OrderedDict()
+        self.signature_cache_size = 1024
+        self.signature_cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0}
+
+    def tokenize(self, text):
+        """Lowercase word tokens used for shingling"""
+        return re.findall(r'\w+', text.lower())
+
+    def get_shingles(self, text):
+        """Build overlapping word shingles from the text"""
+        tokens = self.tokenize(text)
+        if len(tokens) < self.shingle_size:
+            return [' '.join(tokens)] if tokens else []
+
+        return [' '.join(tokens[i:i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)]
+
+    def hash_shingle(self, shingle):
+        """Stable 64-bit hash of a shingle"""
+        return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def compute_simhash(self, text):
+        """Compute a 64-bit SimHash signature for the text"""
+        weights = [0] * 64
+        for shingle in self.get_shingles(text):
+            shingle_hash = self.hash_shingle(shingle)
+            for bit in range(64):
+                if shingle_hash & (1 << bit):
+                    weights[bit] += 1
+                else:
+                    weights[bit] -= 1
+
+        signature = 0
+        for bit in range(64):
+            if weights[bit] > 0:
+                signature |= 1 << bit
+
+        return signature
+
+    def get_signature(self, url, content):
+        """Return the signature for a URL, reusing the cached one if the content is unchanged"""
+        content_digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+        with self.signature_cache_lock:
+            cached = self.signature_cache.get(url)
+            if cached and cached[0] == content_digest:
+                self.signature_cache.move_to_end(url)
+                self.cache_stats['hits'] += 1
+                return cached[1]
+            self.cache_stats['misses'] += 1
+
+        signature = self.compute_simhash(content)
+
+        with self.signature_cache_lock:
+            self.signature_cache[url] = (content_digest, signature)
+            self.signature_cache.move_to_end(url)
+            while len(self.signature_cache) > self.signature_cache_size:
+                self.signature_cache.popitem(last=False)
+
+        return signature
+
+    def hamming_distance(self, first, second):
+        """Number of differing bits between two signatures"""
+        return bin(first ^ second).count('1')
+
+    def merge_document(self, kept, doc):
+        """Add doc to kept unless it near-duplicates a kept document; return the merge record if merged"""
+        # Keep the signature on the document itself: the shared cache entry for
+        # its URL may be replaced by a concurrent request with different content
+        signature = self.get_signature(doc['url'], doc['content'])
+        doc['signature'] = signature
+
+        for i, kept_doc in enumerate(kept):
+            distance = self.hamming_distance(signature, kept_doc['signature'])
+            if distance > self.max_distance:
+                continue
+
+            # Keep the more relevant copy of the two
+            if doc.get('relevance', 0.5) > kept_doc.get('relevance', 0.5):
+                doc['merged_sources'] = kept_doc.get('merged_sources', []) + [kept_doc['source']]
+                kept[i] = doc
+                keeper, dropped = doc, kept_doc
+            else:
+                kept_doc.setdefault('merged_sources', []).append(doc['source'])
+                keeper, dropped = kept_doc, doc
+
+            print(f"Merged near-duplicate {dropped['source']} into {keeper['source']}")
+            return {
+                'kept_source': keeper['source'],
+                'kept_url': keeper['url'],
+                'merged_source': dropped['source'],
+                'merged_url': dropped['url'],
+                'similarity': round(1 - distance / 64, 3)
+            }
+
+        kept.append(doc)
+        return None
+
+    def build_report(self, documents_before, kept, merged):
+        """Summarise a deduplication pass for analysis_details"""
+        return {
+            'documents_before': documents_before,
+            'documents_after': len(kept),
+            'merged_documents': merged
+        }
+
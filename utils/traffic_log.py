@@ -0,0 +1,52 @@
+import json
+import re
+import threading
+import time
+
+
+class TrafficRecorder:
+    def __init__(self, log_path=None):
+        # Capture is off unless a log path is given
+        self.log_path = log_path
+        self.lock = threading.Lock()
+
+        # Patterns that could identify the person who sent the statement
+        self.redactions = [
+            (re.compile(r'\S+@\S+\.\w+'), '[email]'),
+            (re.compile(r'https?://\S+|www\.\S+'), '[url]'),
+            (re.compile(r'@\w+'), '[handle]'),
+            # Phone numbers only: years, ranges, decimals and counts are the facts being checked
+            (re.compile(r'\+\d[\d\s().-]{6,}\d'), '[phone]'),
+            (re.compile(r'\(?\b\d{3}\)?[\s.-]\d{3}[\s.-]\d{4}\b'), '[phone]'),
+            (re.compile(r'\b0\d{2,4}[\s-]\d{3,4}[\s-]\d{3,4}\b'), '[phone]')
+        ]
+
+    @property
+    def enabled(self):
+        return bool(self.log_path)
+
+    def anonymize_statement(self, statement):
+        """Strip personal identifiers from a statement before it is logged"""
+        for pattern, placeholder in self.redactions:
+            statement = pattern.sub(placeholder, statement)
+        return statement
+
+    def record(self, statement, status, stage_timings, sources_analyzed=0):
+        """Append one /check_fact request to the JSONL capture log"""
+        if not self.enabled:
+            return
+
+        entry = {
+            'timestamp': round(time.time(), 3),
+            'payload': {'statement': self.anonymize_statement(statement)},
+            'status': status,
+            'sources_analyzed': sources_analyzed,
+            'stage_timings': {stage: round(seconds, 4) for stage, seconds in stage_timings.items()}
+        }
+
+        try:
+            with self.lock:
+                with open(self.log_path, 'a', encoding='utf-8') as log_file:
+                    log_file.write(json.dumps(entry) + '\n')
+        except OSError as e:
+            print(f"Traffic capture error: {e}")
@@ -1,8 +1,10 @@
 import requests
+import threading
+from collections import OrderedDict
 from bs4 import BeautifulSoup
 import time
 import random
-from urllib.parse import quote_plus, urljoin
+from urllib.parse import urljoin
 import re
 import json
 
@@ -14,65 +16,245 @@ class WebScraper:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
 
+        # Seconds to wait before each page request, to be respectful to the sites
+        self.request_delay = 1
+
+        # Pages scraped for real versus replaced by simulated content
+        self.scrape_stats = {'scraped': 0, 'simulated': 0}
+        self.scrape_stats_lock = threading.Lock()
+
+        self.wikipedia_api_url = "https://en.wikipedia.org/w/api.php"
+
+        # Resolved title -> (cached_at, summary), or a None summary for titles
+        # not found. Least recently used entries are evicted past the size
+        # limit, and not-found entries expire so new pages get picked up
+        self.wikipedia_cache = OrderedDict()
+        self.wikipedia_cache_size = 1024
+        self.wikipedia_missing_ttl = 3600
+        self.wikipedia_cache_lock = threading.Lock()
+        self.cache_stats = {'hits': 0, 'misses': 0}
+
+        # Stop words that can still appear inside a title ("Great Wall of China")
+        self.title_connectors = {'of', 'the', 'and', 'de'}
+
+        # Words that never help identify an article title
+        self.title_stop_words = {
+            'is', 'a', 'an', 'the', 'are', 'was', 'were', 'be', 'been', 'of', 'in', 'on', 'at', 'to', 'and',
+            'or', 'for', 'by', 'with', 'from', 'that', 'this', 'it', 'its', 'as', 'has', 'have', 'had', 'do',
+            'does', 'did', 'not', 'no', 'can', 'will', 'very', 'also', 'than', 'then', 'there', 'which'
+        }
+
+    def is_title_word(self, word):
+        """Whether a word can start or end a candidate title"""
+        if word.lower() in self.title_stop_words or not any(char.isalpha() for char in word):
+            return False
+        # Short words only count when they are acronyms or numerals ("UN", "II")
+        return len(word) > 2 or word.isupper()
+
+    def format_title(self, words):
+        """Join words into a title, capitalising only the first letter as Wikipedia does"""
+        title = '_'.join(words)
+        return title[:1].upper() + title[1:]
+
+    def build_wikipedia_candidates(self, query, max_candidates=8):
+        """Build ranked candidate Wikipedia titles from the statement"""
+        # Keep the original casing so proper nouns survive into the titles
+        words = re.findall(r"[\w'-]+", query)
+
+        # Runs of capitalised words are likely names ("Great Wall of China")
+        phrases = []
+        run = []
+        for word in words + ['']:
+            if word[:1].isupper() or (run and word.lower() in self.title_connectors):
+                run.append(word)
+                continue
+            while run and not self.is_title_word(run[0]):
+                run.pop(0)
+            while run and not self.is_title_word(run[-1]):
+                run.pop()
+            if run:
+                phrases.append(self.format_title(run))
+            run = []
+
+        # Contiguous n-grams that start and end on meaningful words, longest first
+        ngrams = []
+        for size in (3, 2):
+            for i in range(len(words) - size + 1):
+                ngram = words[i:i + size]
+                if not (self.is_title_word(ngram[0]) and self.is_title_word(ngram[-1])):
+                    continue
+                if any(word.lower() in self.title_stop_words and word.lower() not in self.title_connectors
+                       for word in ngram[1:-1]):
+                    continue
+                ngrams.append(self.format_title(ngram))
+
+        # Single words, proper nouns first, then longer (more specific) words
+        significant = [word for word in words if self.is_title_word(word) and len(word) > 3]
+        ranked_words = sorted(significant, key=lambda word: (not word[:1].isupper(), -len(word)))
+        unigrams = [self.format_title([word]) for word in ranked_words]
+
+        # The original first guess: the three most significant words, stop words
+        # skipped ("Python_programming_language", which redirects to the article)
+        key_word_title = self.format_title(significant[:3]) if significant else ''
+
+        # The first sentence as written, the original fallback lookup
+        sentence = query.split('.')[0].strip().replace(' ', '_')
+
+        def unique(titles, taken):
+            result = []
+            for title in titles:
+                if title and title.lower() not in taken:
+                    taken.add(title.lower())
+                    result.append(title)
+            return result
+
+        # Always reserve slots for the key-word guess, the sentence fallback
+        # and the two best single words
+        taken = set()
+        reserved_key_words = unique([key_word_title], taken)
+        reserved_sentence = unique([sentence], taken)
+        reserved_unigrams = unique(unigrams, taken)[:2]
+        remaining = (max_candidates - len(reserved_key_words) - len(reserved_sentence)
+                     - len(reserved_unigrams))
+
+        leading = unique(phrases + ngrams, taken)[:max(0, remaining)]
+        remaining -= len(leading)
+        extra_unigrams = unique(unigrams, taken)[:max(0, remaining)]
+
+        candidates = reserved_key_words + leading + reserved_unigrams + extra_unigrams + reserved_sentence
+        return candidates[:max_candidates]
+
+    def get_cached_wikipedia(self, title):
+        """Return (found, summary) for a title from the cache"""
+        with self.wikipedia_cache_lock:
+            entry = self.wikipedia_cache.get(title)
+            if entry is not None and entry[1] is None and time.time() - entry[0] > self.wikipedia_missing_ttl:
+                del self.wikipedia_cache[title]
+                entry = None
+
+            if entry is None:
+                self.cache_stats['misses'] += 1
+                return False, None
+
+            self.wikipedia_cache.move_to_end(title)
+            self.cache_stats['hits'] += 1
+            return True, entry[1]
+
+    def cache_wikipedia(self, title, summary):
+        """Store a resolved title, evicting the least recently used entries"""
+        with self.wikipedia_cache_lock:
+            self.wikipedia_cache[title] = (time.time(), summary)
+            self.wikipedia_cache.move_to_end(title)
+            while len(self.wikipedia_cache) > self.wikipedia_cache_size:
+                self.wikipedia_cache.popitem(last=False)
+
+    def resolve_wikipedia_titles(self, titles):
+        """Resolve several titles with one batched MediaWiki query, using the cache where possible"""
+        summaries = {}
+        pending = []
+        for title in titles:
+            found, summary = self.get_cached_wikipedia(title)
+            if found:
+                summaries[title] = summary
+            else:
+                pending.append(title)
+
+        if pending:
+            params = {
+                'action': 'query',
+                'format': 'json',
+                'titles': '|'.join(title.replace('_', ' ') for title in pending),
+                'redirects': 1,
+                'prop': 'extracts|info|pageprops',
+                'exintro': 1,
+                'explaintext': 1,
+                'exlimit': 'max',
+                'inprop': 'url',
+                'ppprop': 'disambiguation'
+            }
+
+            response = self.session.get(self.wikipedia_api_url, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json().get('query', {})
+
+            # Follow title normalisation and redirects back to the requested titles
+            renames = {}
+            for entry in data.get('normalized', []) + data.get('redirects', []):
+                renames[entry['from']] = entry['to']
+
+            pages = {page.get('title'): page for page in data.get('pages', {}).values()}
+
+            for title in pending:
+                resolved = title.replace('_', ' ')
+                seen = {resolved}
+                while resolved in renames and renames[resolved] not in seen:
+                    resolved = renames[resolved]
+                    seen.add(resolved)
+
+                page = pages.get(resolved)
+                if (not page or 'missing' in page or 'invalid' in page
+                        or 'disambiguation' in page.get('pageprops', {}) or not page.get('extract')):
+                    summaries[title] = None
+                else:
+                    summaries[title] = {
+                        'title': page.get('title', ''),
+                        'url': page.get('fullurl', ''),
+                        'extract': page.get('extract', '')
+                    }
+                self.cache_wikipedia(title, summaries[title])
+
+        return summaries
+
+    def score_wikipedia_extract(self, query, summary, rank):
+        """Score a resolved summary by term overlap with the statement and candidate rank"""
+        query_words = set(word for word in re.findall(r"[\w'-]+", query.lower())
+                          if word not in self.title_stop_words and len(word) > 2)
+        if not query_words:
+            return 1.0 / (rank + 1)
+
+        title_words = set(re.findall(r"[\w'-]+", summary['title'].lower()))
+        extract_words = set(re.findall(r"[\w'-]+", summary['extract'].lower()))
+
+        title_overlap = len(query_words & title_words) / len(query_words)
+        extract_overlap = len(query_words & extract_words) / len(query_words)
+
+        return 2 * title_overlap + extract_overlap + 0.1 / (rank + 1)
+
     def search_wikipedia_api(self, query):
         """Search Wikipedia using the API for specific articles"""
-        try:
-            # Clean the query for Wikipedia - better parsing
-            clean_query = query.lower().strip(' .')
-
-            # Remove common phrases and focus on key nouns
-            phrases_to_remove = ['is a', 'are', 'was', 'were', 'the', 'a', 'an']
-            for phrase in phrases_to_remove:
-                clean_query = clean_query.replace(phrase, ' ')
-
-            # Take the most significant words (nouns/verbs)
-            words = [word for word in clean_query.split() if len(word) > 3][:3]
-            if not words:
-                words = clean_query.split()[:2]
-
-            search_term = '_'.join(words).title()
-
-            api_url = "https://en.wikipedia.org/api/rest_v1/page/summary/"
-            encoded_term = quote_plus(search_term)
-            full_url = api_url + encoded_term
-
-            response = self.session.get(full_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "name": "Wikipedia",
-                    "url": data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                    "title": data.get('title', ''),
-                    "extract": data.get('extract', ''),
-                    "relevance": 0.95,
-                    "type": "encyclopedia"
-                }
+        candidates = self.build_wikipedia_candidates(query)
+        if not candidates:
+            return None
 
+        try:
+            summaries = self.resolve_wikipedia_titles(candidates)
         except Exception as e:
             print(f"Wikipedia API search error: {e}")
+            return None
 
-        # Fallback: try the original query
-        try:
-            clean_query_fallback = query.split('.')[0].strip().replace(' ', '_')
-            api_url = "https://en.wikipedia.org/api/rest_v1/page/summary/"
-            encoded_term = quote_plus(clean_query_fallback)
-            full_url = api_url + encoded_term
-
-            response = self.session.get(full_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    "name": "Wikipedia",
-                    "url": data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                    "title": data.get('title', ''),
-                    "extract": data.get('extract', ''),
-                    "relevance": 0.90,
-                    "type": "encyclopedia"
-                }
-        except:
-            pass
+        best = None
+        best_score = 0
+        best_rank = 0
+        for rank, title in enumerate(candidates):
+            summary = summaries.get(title)
+            if not summary:
+                continue
 
-        return None
+            score = self.score_wikipedia_extract(query, summary, rank)
+            if score > best_score:
+                best, best_score, best_rank = summary, score, rank
+
+        if not best:
+            return None
+
+        return {
+            "name": "Wikipedia",
+            "url": best['url'],
+            "title": best['title'],
+            "extract": best['extract'],
+            "relevance": 0.95 if best_rank == 0 else 0.90,
+            "type": "encyclopedia"
+        }
 
     def search_sources(self, query):
         """Search for relevant sources using multiple strategies"""
@@ -147,7 +329,7 @@ class WebScraper:
         try:
             print(f"Scraping content from: {url}")
 
-            time.sleep(1)  # Be respectful
+            time.sleep(self.request_delay)  # Be respectful
 
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
@@ -172,17 +354,25 @@ class WebScraper:
                 # Clean the content
                 content = self.clean_content(content)
                 print(f"Successfully extracted {len(content)} characters from {url}")
+                self.count_scrape('scraped')
                 return content[:3000]  # Limit content length
             else:
                 print(f"Insufficient content from {url}")
                 # Return a simulated content based on URL for demo purposes
+                self.count_scrape('simulated')
                 return self.get_simulated_content(url)
 
         except Exception as e:
             print(f"Error scraping {url}: {str(e)}")
             # Return simulated content as fallback
+            self.count_scrape('simulated')
             return self.get_simulated_content(url)
 
+    def count_scrape(self, outcome):
+        """Count a scrape outcome for scrape_stats"""
+        with self.scrape_stats_lock:
+            self.scrape_stats[outcome] += 1
+
     def get_simulated_content(self, url):
         """Provide simulated content when scraping fails - for demo purposes"""
         if 'wikipedia' in url: